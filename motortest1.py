@@ -1,15 +1,18 @@
-from gpiozero import PWMOutputDevice
-from time import sleep
+from rpi_hardware_pwm import HardwarePWM
 
 # --- CONFIGURATION ---
-# Change '18' to the GPIO pin you are using (BCM numbering)
-MOTOR_PIN = 6 
-
-# Initialize the motor pin
-# Default frequency is usually 100Hz
-motor = PWMOutputDevice(MOTOR_PIN, active_high=True, initial_value=0, frequency=200)
-
-print("--- Raspberry Pi PWM Motor Tester ---")
+# Hardware PWM comes from the SoC peripheral, not a software timing loop,
+# so the waveform is jitter-free and costs no CPU.
+# Requires dtoverlay=pwm-2chan in /boot/config.txt:
+#   channel 0 -> GPIO 12 (or 18), channel 1 -> GPIO 13 (or 19)
+PWM_CHANNEL = 0
+PWM_CHIP = 0
+
+# Initialize the motor channel at 200Hz, 0% duty
+motor = HardwarePWM(pwm_channel=PWM_CHANNEL, hz=200, chip=PWM_CHIP)
+motor.start(0)
+
+print("--- Raspberry Pi PWM Motor Tester (hardware PWM) ---")
 print("Commands: 'd' for Duty Cycle (0-100), 'f' for Frequency (Hz), 'q' to Quit")
 
 try:
@@ -18,18 +21,17 @@ try:
 
         if cmd == 'd':
             val = float(input("Enter Duty Cycle (0 to 100): "))
-            # gpiozero uses 0.0 to 1.0 for duty cycle
-            motor.value = val / 100
+            motor.change_duty_cycle(val)
             print(f"Duty Cycle set to {val}%")
 
         elif cmd == 'f':
-            val = int(input("Enter Frequency in Hz (e.g., 50 to 2000): "))
-            motor.frequency = val
+            val = int(input("Enter Frequency in Hz (e.g., 50 to 20000): "))
+            motor.change_frequency(val)
             print(f"Frequency set to {val} Hz")
 
         elif cmd == 'q':
             print("Shutting down...")
-            motor.value = 0
+            motor.change_duty_cycle(0)
             break
         else:
             print("Invalid command. Use d, f, or q.")
@@ -37,4 +39,4 @@ try:
 except KeyboardInterrupt:
     print("\nInterrupted by user.")
 finally:
-    motor.close()
+    motor.stop()
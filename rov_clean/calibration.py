@@ -21,7 +21,18 @@ if os.path.exists(CALIB_FILE):
         log(f"[CAL] unable to load calibration file: {e}")
 
 def save_calib():
+    # Snapshot under the lock, serialize and write outside it, then swap the
+    # file into place atomically so a mid-write crash can't truncate it
     with cal_lock:
-        with open(CALIB_FILE, 'w') as f:
-            json.dump(calib, f, indent=2)
+        snapshot = dict(calib)
+    tmp = CALIB_FILE + '.tmp'
+    try:
+        with open(tmp, 'w') as f:
+            json.dump(snapshot, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, CALIB_FILE)
+    except Exception as e:
+        log(f"[CAL] save failed: {e}")
+        return
     log("[CAL] Saved.")
@@ -1,9 +1,10 @@
 # camera_module.py
-import io, time, os, threading, shutil
+import io, time, os, fcntl, subprocess, threading, shutil
 from datetime import datetime
+import numpy as np
 from picamera2 import Picamera2
-from picamera2.encoders import H264Encoder
-from picamera2.outputs import FfmpegOutput
+from picamera2.encoders import H264Encoder, MJPEGEncoder
+from picamera2.outputs import FfmpegOutput, FileOutput
 from PIL import Image, ImageDraw, ImageFont
 from logger import log
 from config import sensor_data
@@ -11,12 +12,13 @@ from config import sensor_data
 picam2 = None
 camera_lock = threading.Lock()
 
-# Recording state
+# Recording state (recording_start_time is monotonic, not wall-clock)
 recording = False
 recording_start_time = None
 current_recording_file = None
 encoder = None
 output = None
+_record_thread = None
 
 # Camera busy flag — True when switching modes (still capture)
 camera_busy = False
@@ -43,33 +45,129 @@ else:
 # Video resolution - 1080p
 VIDEO_SIZE = (1920, 1080)
 VIDEO_BITRATE = 15000000  # 15 Mbps for 1080p
+STREAM_BITRATE = 5000000  # 5 Mbps MJPEG budget for the Wi-Fi live stream
+STILL_JPEG_QUALITY = 85   # with optimize+progressive, visually a wash vs 95
+
+# Recording backend:
+#   'overlay' - per-frame HUD burned into the video via a Python loop + ffmpeg
+#   'hw'      - plain hardware H264Encoder, no overlay (lowest CPU)
+RECORD_MODE = 'overlay'
+RECORD_SIZE = (1280, 720)
+RECORD_FPS = 24
+RECORD_BITRATE = 8000000  # 8 Mbps is plenty at 720p
+
+
+def _detect_h264_encoder():
+    """Pick ffmpeg's VideoCore encoder if present, else fall back to libx264."""
+    try:
+        result = subprocess.run(['ffmpeg', '-hide_banner', '-encoders'],
+                                capture_output=True, text=True, timeout=10)
+        if 'h264_v4l2m2m' in result.stdout:
+            return 'h264_v4l2m2m'
+    except Exception as e:
+        log(f"[CAM] ffmpeg encoder probe failed: {e}")
+    return 'libx264'
+
+
+H264_ENCODER = _detect_h264_encoder() if FFMPEG_AVAILABLE else 'libx264'
+if FFMPEG_AVAILABLE:
+    log(f"[CAM] Recording encoder: {H264_ENCODER}")
+
+
+class StreamingOutput(io.BufferedIOBase):
+    """Latest-frame sink for the MJPEG stream encoder.
+
+    The encoder calls write() once per complete JPEG; viewers wait on the
+    condition and read the newest frame, so one encode serves every client.
+    """
+
+    def __init__(self):
+        self.frame = None
+        self.condition = threading.Condition()
+
+    def write(self, buf):
+        with self.condition:
+            self.frame = buf
+            self.condition.notify_all()
+        return len(buf)
+
+
+stream_output = StreamingOutput()
+stream_encoder = None
+
+# Multipart framing for the MJPEG stream - built once, not per frame
+MJPEG_HEADER = b'--frame\r\nContent-Type: image/jpeg\r\n\r\n'
+MJPEG_TRAILER = b'\r\n'
+
+
+def _start_stream_encoder(cam):
+    """Attach the hardware MJPEG encoder that feeds the live stream."""
+    global stream_encoder
+    try:
+        stream_encoder = MJPEGEncoder(bitrate=STREAM_BITRATE)
+        cam.start_encoder(stream_encoder, FileOutput(stream_output))
+        log("[CAM] MJPEG stream encoder started")
+    except Exception as e:
+        stream_encoder = None
+        log(f"[CAM] Failed to start MJPEG encoder: {e}")
+
+
+def _stop_stream_encoder(cam):
+    """Detach the MJPEG stream encoder (before a mode switch)."""
+    global stream_encoder
+    if stream_encoder is not None:
+        try:
+            cam.stop_encoder(stream_encoder)
+        except Exception as e:
+            log(f"[CAM] Failed to stop MJPEG encoder: {e}")
+        stream_encoder = None
+
+
+# Video configuration, built once and reused for every (re)configure
+video_config = None
+
 
 def init_camera():
-    """Initialize the Picamera2 instance lazily and return it."""
-    global picam2
-    if picam2 is None:
+    """Initialize the Picamera2 instance lazily and return it.
+
+    Double-checked lock: concurrent first requests (e.g. /video_feed and
+    /capture_image) must not race into two Picamera2 constructors.
+    """
+    global picam2, video_config
+    if picam2 is not None:
+        return picam2
+    with camera_lock:
+        if picam2 is not None:
+            return picam2
         try:
-            picam2 = Picamera2()
-            vc = picam2.create_video_configuration(
-                main={"size": VIDEO_SIZE},
-                controls={"FrameRate": 30}
-            )
-            picam2.configure(vc)
-            picam2.start()
+            cam = Picamera2()
+            if video_config is None:
+                # RGB888 so capture_array() hands back 3-channel frames
+                # directly; the lores stream is scaled to RECORD_SIZE by
+                # the ISP so recording never resizes in Python
+                video_config = cam.create_video_configuration(
+                    main={"size": VIDEO_SIZE, "format": "RGB888"},
+                    lores={"size": RECORD_SIZE, "format": "YUV420"},
+                    controls={"FrameRate": 30}
+                )
+            cam.configure(video_config)
+            cam.start()
             # Set focus mode (respects stored state)
             try:
                 if current_focus_mode == 0:
-                    picam2.set_controls({"AfMode": 0, "LensPosition": current_lens_position})
+                    cam.set_controls({"AfMode": 0, "LensPosition": current_lens_position})
                     log(f"[CAM] Manual focus, lens position: {current_lens_position:.1f}")
                 elif current_focus_mode == 1:
-                    picam2.set_controls({"AfMode": 1, "AfTrigger": 0})
+                    cam.set_controls({"AfMode": 1, "AfTrigger": 0})
                     log("[CAM] Single-shot AF")
                 else:
-                    picam2.set_controls({"AfMode": 2, "AfSpeed": 1})
+                    cam.set_controls({"AfMode": 2, "AfSpeed": 1})
                     log("[CAM] Continuous AF enabled")
             except Exception:
                 pass  # Camera may not support AF
+            _start_stream_encoder(cam)
             log(f"[CAM] Picamera2 initialized at {VIDEO_SIZE[0]}x{VIDEO_SIZE[1]}")
+            picam2 = cam
         except Exception as e:
             picam2 = None
             log(f"[CAM] Failed to init camera: {e}")
@@ -125,34 +223,56 @@ def get_focus_status():
 
 
 def generate_frames():
-    """Generator that yields JPEG frames from the Picamera2."""
-    cam = init_camera()
-    stream = io.BytesIO()
+    """Generator that yields hardware-encoded JPEG frames from the stream encoder.
+
+    Each client blocks on the shared condition until the encoder publishes a
+    new frame, so every viewer gets each frame at most once and slow clients
+    simply skip frames instead of queueing them.
+    """
+    init_camera()
+    # Hoist attribute lookups out of the 30 Hz loop
+    out = stream_output
+    cond = out.condition
+    wait = cond.wait
     while True:
         try:
-            cam.capture_file(stream, format="jpeg")
-            stream.seek(0)
-            frame = stream.read()
-            stream.seek(0)
-            stream.truncate()
-            yield (b'--frame\r\nContent-Type: image/jpeg\r\n\r\n' + frame + b'\r\n')
-            time.sleep(1 / 30)
+            with cond:
+                wait(timeout=1.0)
+                frame = out.frame
+            if frame is None:
+                continue
+            # Yield the pieces separately so the frame bytes are never copied
+            # into a fresh concatenated object per iteration
+            yield MJPEG_HEADER
+            yield frame
+            yield MJPEG_TRAILER
         except Exception as e:
-            log(f"[CAM] capture error: {e}")
+            log(f"[CAM] stream error: {e}")
             time.sleep(1)
 
+# Opacity of the black telemetry bar (0-255)
+OVERLAY_BAR_ALPHA = 180
+
+# Overlay font, loaded once - re-parsing the TTF per capture is wasted work
+try:
+    OVERLAY_FONT = ImageFont.truetype(
+        "/usr/share/fonts/truetype/dejavu/DejaVuSansMono.ttf", 36)
+except (IOError, OSError):
+    OVERLAY_FONT = ImageFont.load_default()
+
+
 def add_telemetry_overlay(filepath):
-    """Add telemetry text overlay to a captured image using Pillow."""
+    """Add telemetry text overlay to a captured image using Pillow.
+
+    Only the bottom bar strip is touched: it is darkened in place with a
+    NumPy fixed-point blend and the text drawn onto that strip, instead of
+    alpha-compositing two full-resolution RGBA copies of the image.
+    """
     try:
-        img = Image.open(filepath)
-        draw = ImageDraw.Draw(img)
+        img = Image.open(filepath).convert('RGB')
 
         # Get current sensor data
-        depth = sensor_data.get('depth_ft', 0.0)
-        pitch = sensor_data.get('pitch', 0.0)
-        roll = sensor_data.get('roll', 0.0)
-        heading = sensor_data.get('yaw', 0.0)
-        water_temp = sensor_data.get('temperature_f', 0.0)
+        depth, pitch, roll, heading, water_temp = _snapshot_sensors()
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
         # Format telemetry string
@@ -161,14 +281,10 @@ def add_telemetry_overlay(filepath):
             f"Heading: {heading:.0f}\u00B0  |  Water: {water_temp:.1f}\u00B0F  |  {timestamp}"
         )
 
-        # Try to use a monospace font, fall back to default
-        try:
-            font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSansMono.ttf", 36)
-        except (IOError, OSError):
-            font = ImageFont.load_default()
+        font = OVERLAY_FONT
 
-        # Calculate text size and position
-        bbox = draw.textbbox((0, 0), telemetry_text, font=font)
+        # Calculate text size and bar geometry
+        bbox = font.getbbox(telemetry_text)
         text_width = bbox[2] - bbox[0]
         text_height = bbox[3] - bbox[1]
 
@@ -176,40 +292,37 @@ def add_telemetry_overlay(filepath):
         bar_height = text_height + 20
         bar_y = img_height - bar_height
 
-        # Draw semi-transparent black bar at bottom
-        overlay = Image.new('RGBA', img.size, (0, 0, 0, 0))
-        overlay_draw = ImageDraw.Draw(overlay)
-        overlay_draw.rectangle(
-            [(0, bar_y), (img_width, img_height)],
-            fill=(0, 0, 0, 180)
-        )
-
-        # Composite the overlay
-        if img.mode != 'RGBA':
-            img = img.convert('RGBA')
-        img = Image.alpha_composite(img, overlay)
+        # Darken just the bar strip toward black: out = in * (255 - alpha) / 256
+        strip = img.crop((0, bar_y, img_width, img_height))
+        arr = np.asarray(strip, dtype=np.uint16)
+        arr = (arr * (255 - OVERLAY_BAR_ALPHA)) >> 8
+        strip = Image.fromarray(arr.astype(np.uint8))
 
-        # Draw text
-        draw = ImageDraw.Draw(img)
+        # Draw text onto the strip, then paste it back
+        draw = ImageDraw.Draw(strip)
         text_x = (img_width - text_width) // 2
-        text_y = bar_y + 10
-        draw.text((text_x, text_y), telemetry_text, font=font, fill=(255, 255, 255, 255))
+        draw.text((text_x, 10), telemetry_text, font=font, fill=(255, 255, 255))
+        img.paste(strip, (0, bar_y))
 
-        # Convert back to RGB for JPEG save
-        img = img.convert('RGB')
-        img.save(filepath, 'JPEG', quality=95)
+        img.save(filepath, 'JPEG', quality=STILL_JPEG_QUALITY,
+                 optimize=True, progressive=True)
         log(f"[CAM] Telemetry overlay added to image")
 
     except Exception as e:
         log(f"[CAM] Failed to add telemetry overlay: {e}")
 
+# Max resolution still config, built once per camera (Pi Camera Module v3: 4608x2592)
+STILL_SIZE = (4608, 2592)
+still_config = None
+
+
 def capture_still():
     """
     Capture a high-resolution still image with telemetry overlay.
     Returns the filename of the saved image.
     Sets camera_busy flag during the mode switch.
     """
-    global picam2, camera_busy
+    global picam2, camera_busy, still_config
 
     with camera_lock:
         try:
@@ -221,103 +334,350 @@ def capture_still():
             filename = f"ROV_{timestamp}_depth-{depth:.1f}ft.jpg"
             filepath = os.path.join(IMAGES_DIR, filename)
 
-            # Stop current camera config
-            if picam2 is not None:
-                picam2.stop()
+            if picam2 is None:
+                log("[CAM] Camera not initialized for still capture")
+                camera_busy = False
+                return None
 
-                # Configure for max resolution still capture
-                # Pi Camera Module v3 max: 4608 x 2592
+            if still_config is None:
                 still_config = picam2.create_still_configuration(
-                    main={"size": (4608, 2592)},
+                    main={"size": STILL_SIZE},
                 )
-                picam2.configure(still_config)
-                picam2.start()
-                time.sleep(0.5)  # Allow camera to adjust
 
-                # Capture the image
-                picam2.capture_file(filepath)
-                log(f"[CAM] Still captured: {filename}")
+            # Atomic mode swap: capture one still and return to video mode
+            # without the old stop/reconfigure/start/sleep cycle
+            _stop_stream_encoder(picam2)
+            picam2.switch_mode_and_capture_file(still_config, filepath)
+            _start_stream_encoder(picam2)
+            log(f"[CAM] Still captured: {filename}")
 
-                # Add telemetry overlay
-                add_telemetry_overlay(filepath)
+            # Add telemetry overlay
+            add_telemetry_overlay(filepath)
 
-                # Reconfigure back to video mode
-                picam2.stop()
-                vc = picam2.create_video_configuration(
-                    main={"size": VIDEO_SIZE},
-                    controls={"FrameRate": 30}
-                )
-                picam2.configure(vc)
-                picam2.start()
-                # Restore focus mode
-                try:
-                    if current_focus_mode == 0:
-                        picam2.set_controls({"AfMode": 0, "LensPosition": current_lens_position})
-                    elif current_focus_mode == 1:
-                        picam2.set_controls({"AfMode": 1, "AfTrigger": 0})
-                    else:
-                        picam2.set_controls({"AfMode": 2, "AfSpeed": 1})
-                except Exception:
-                    pass
+            # Restore focus mode (the mode switch can reset AF state)
+            try:
+                if current_focus_mode == 0:
+                    picam2.set_controls({"AfMode": 0, "LensPosition": current_lens_position})
+                elif current_focus_mode == 1:
+                    picam2.set_controls({"AfMode": 1, "AfTrigger": 0})
+                else:
+                    picam2.set_controls({"AfMode": 2, "AfSpeed": 1})
+            except Exception:
+                pass
 
-                camera_busy = False
-                return filename
-            else:
-                log("[CAM] Camera not initialized for still capture")
-                camera_busy = False
-                return None
+            camera_busy = False
+            return filename
 
         except Exception as e:
             log(f"[CAM] Still capture error: {e}")
-            # Try to recover video mode
+            # Make sure the stream encoder is running again
             try:
-                if picam2 is not None:
-                    picam2.stop()
-                    vc = picam2.create_video_configuration(
-                        main={"size": VIDEO_SIZE},
-                        controls={"FrameRate": 30}
-                    )
-                    picam2.configure(vc)
-                    picam2.start()
+                if picam2 is not None and stream_encoder is None:
+                    _start_stream_encoder(picam2)
             except Exception as recovery_err:
                 log(f"[CAM] Recovery failed: {recovery_err}")
             camera_busy = False
             return None
 
+# Linux fcntl op to resize a pipe, and the size we ask for - a burst of NAL
+# units at 1080p/15 Mbps can fill the default 64 KiB pipe and stall the encoder
+F_SETPIPE_SZ = 1031
+FFMPEG_PIPE_BYTES = 1 << 20
+
+
+class BufferedFfmpegOutput(FfmpegOutput):
+    """FfmpegOutput with an enlarged stdin pipe toward ffmpeg."""
+
+    def start(self):
+        super().start()
+        try:
+            fcntl.fcntl(self.ffmpeg.stdin, F_SETPIPE_SZ, FFMPEG_PIPE_BYTES)
+        except (OSError, AttributeError) as e:
+            log(f"[CAM] Could not enlarge ffmpeg pipe: {e}")
+
+
+# HUD geometry/font for the recording overlay (smaller than the still font)
+HUD_BAR_HEIGHT = 36
+try:
+    HUD_FONT = ImageFont.truetype(
+        "/usr/share/fonts/truetype/dejavu/DejaVuSansMono.ttf", 20)
+except (IOError, OSError):
+    HUD_FONT = ImageFont.load_default()
+
+
+# Red in BT.601: Y=81, U=90, V=240
+_REC_LUMA, _REC_U, _REC_V = 81, 90, 240
+
+
+def _build_rec_tile():
+    """Prerender the REC indicator as boolean masks.
+
+    The dot and label never change, so they are rasterized once; the
+    full-res mask stamps the Y plane and the half-res mask stamps the
+    subsampled chroma planes red.
+    """
+    tile = Image.new('L', (90, 36), 0)
+    draw = ImageDraw.Draw(tile)
+    draw.ellipse((10, 10, 26, 26), fill=255)
+    draw.text((32, 8), "REC", font=HUD_FONT, fill=255)
+    mask = np.asarray(tile) > 127
+    return mask, mask[::2, ::2]
+
+
+_REC_MASK, _REC_MASK_HALF = _build_rec_tile()
+
+HUD_TEXT_REFRESH = 0.25  # seconds between text re-rasterizations
+_hud_text_cache = {'deadline': 0.0, 'mask': None}
+
+
+def _snapshot_sensors():
+    """Grab the overlay's sensor values in one pass over sensor_data."""
+    d = sensor_data
+    return (d.get('depth_ft', 0.0), d.get('pitch', 0.0), d.get('roll', 0.0),
+            d.get('yaw', 0.0), d.get('temperature_f', 0.0))
+
+
+# strftime goes through tzdata; format the clock once per second at most
+_clock_cache = {'sec': 0, 'text': ''}
+
+
+def _clock_text():
+    now = int(time.time())
+    if now != _clock_cache['sec']:
+        _clock_cache['sec'] = now
+        _clock_cache['text'] = datetime.now().strftime("%H:%M:%S")
+    return _clock_cache['text']
+
+
+# Glyph atlas: each character the HUD uses is rasterized through FreeType
+# exactly once, then text renders become numpy slice copies
+_glyph_atlas = {}
+
+
+def _glyph(ch):
+    """Return (coverage array, advance) for one character, cached."""
+    cached = _glyph_atlas.get(ch)
+    if cached is None:
+        advance = max(1, round(HUD_FONT.getlength(ch)))
+        tile = Image.new('L', (advance + 2, HUD_BAR_HEIGHT), 0)
+        ImageDraw.Draw(tile).text((0, 6), ch, font=HUD_FONT, fill=255)
+        cached = (np.asarray(tile, dtype=np.uint16), advance)
+        _glyph_atlas[ch] = cached
+    return cached
+
+
+def _render_hud_text_mask():
+    """Compose the current telemetry line into a coverage tile.
+
+    Returns a (HUD_BAR_HEIGHT, width) uint16 alpha array over the bar
+    strip, built by blitting cached glyphs - no FreeType calls after the
+    atlas has warmed up.
+    """
+    depth, pitch, roll, heading, water_temp = _snapshot_sensors()
+    timestamp = _clock_text()
+
+    hud_text = (
+        f"Depth: {depth:.1f} ft | Pitch: {pitch:.1f}° | Roll: {roll:.1f}° | "
+        f"Hdg: {heading:.0f}° | {water_temp:.1f}°F | {timestamp}"
+    )
+
+    width = RECORD_SIZE[0]
+    tile = np.zeros((HUD_BAR_HEIGHT, width), dtype=np.uint16)
+    x = 10
+    for ch in hud_text:
+        arr, advance = _glyph(ch)
+        end = min(x + arr.shape[1], width)
+        if end <= x:
+            break
+        # maximum, not assignment: adjacent glyph tiles may overlap a pixel
+        np.maximum(tile[:, x:end], arr[:, :end - x], out=tile[:, x:end])
+        x += advance
+    return tile
+
+
+def draw_hud_overlay(frame):
+    """Burn the HUD into a RECORD_SIZE YUV420 numpy frame, in place.
+
+    Operates on plane views of the packed (h*3/2, w) array: the bar is a
+    luma darken plus neutralized chroma, and the REC indicator and text
+    are prerendered mask stamps - no RGB conversion anywhere.
+    """
+    width, height = RECORD_SIZE
+    y = frame[:height]
+    u = frame[height:height * 5 // 4].reshape(height // 2, width // 2)
+    v = frame[height * 5 // 4:].reshape(height // 2, width // 2)
+
+    bar_y = height - HUD_BAR_HEIGHT
+
+    # Darken the bar's luma toward black and grey out its chroma
+    y[bar_y:] = ((y[bar_y:].astype(np.uint16)
+                  * (255 - OVERLAY_BAR_ALPHA)) >> 8).astype(np.uint8)
+    u[bar_y // 2:] = 128
+    v[bar_y // 2:] = 128
+
+    # Stamp the red REC indicator into the top-left corner
+    th, tw = _REC_MASK.shape
+    np.copyto(y[:th, :tw], _REC_LUMA, where=_REC_MASK)
+    np.copyto(u[:th // 2, :tw // 2], _REC_U, where=_REC_MASK_HALF)
+    np.copyto(v[:th // 2, :tw // 2], _REC_V, where=_REC_MASK_HALF)
+
+    # Telemetry changes far slower than 24 fps; re-rasterize the text at
+    # 4 Hz and alpha-blend the cached coverage onto every frame in between
+    now = time.monotonic()
+    if now >= _hud_text_cache['deadline']:
+        _hud_text_cache['mask'] = _render_hud_text_mask()
+        _hud_text_cache['deadline'] = now + HUD_TEXT_REFRESH
+    alpha = _hud_text_cache['mask']
+    strip = y[bar_y:]
+    strip[:] = ((strip.astype(np.uint16) * (255 - alpha)
+                 + 235 * alpha) >> 8).astype(np.uint8)
+
+
+def _recording_loop(filepath):
+    """Worker thread for RECORD_MODE='overlay'.
+
+    Captures lores frames, burns the HUD in, and pipes raw YUV420 into
+    ffmpeg using the hardware H.264 encoder when available.
+    """
+    global recording, recording_start_time, current_recording_file
+
+    ffmpeg_cmd = [
+        'ffmpeg', '-y', '-loglevel', 'error',
+        '-f', 'rawvideo', '-pix_fmt', 'yuv420p',
+        '-s', f'{RECORD_SIZE[0]}x{RECORD_SIZE[1]}', '-r', str(RECORD_FPS),
+        '-i', 'pipe:0',
+        '-c:v', H264_ENCODER, '-b:v', str(RECORD_BITRATE),
+        '-pix_fmt', 'yuv420p', filepath,
+    ]
+    try:
+        # bufsize=0: we write whole frames, so BufferedWriter's internal
+        # copy of ~2.7 MB/frame would be pure memory-bandwidth waste
+        proc = subprocess.Popen(ffmpeg_cmd, stdin=subprocess.PIPE, bufsize=0)
+    except Exception as e:
+        log(f"[CAM] Failed to start ffmpeg for overlay recording: {e}")
+        # start_recording holds camera_lock until it finishes publishing
+        # the recording state, so this cleanup is ordered after it
+        with camera_lock:
+            recording = False
+            recording_start_time = None
+            current_recording_file = None
+        return
+    stdin_fd = proc.stdin.fileno()
+
+    # Monotonic deadline pacing: overruns borrow from the next frame's
+    # slack instead of accumulating, so average FPS stays on target
+    frame_interval = 1.0 / RECORD_FPS
+    next_deadline = time.monotonic()
+    failed_frames = 0
+    try:
+        while recording:
+            next_deadline += frame_interval
+            slack = next_deadline - time.monotonic()
+            if slack > 0:
+                time.sleep(slack)
+            elif slack < -frame_interval:
+                # More than a frame behind - re-sync rather than racing
+                # to catch up and starving the overlay work
+                next_deadline = time.monotonic()
+            if camera_busy:
+                # A still capture owns the camera for its mode switch;
+                # skip the frame instead of queueing on camera_lock
+                continue
+            try:
+                # lores frames are RECORD_SIZE YUV420 straight from the ISP
+                # scaler - no Python-side resize or colorspace conversion
+                frame_array = picam2.capture_array("lores")
+                draw_hud_overlay(frame_array)
+                # Write the numpy buffer straight to the fd - no tobytes()
+                # copy and no buffered-IO copy
+                mv = memoryview(frame_array).cast('B')
+                while mv:
+                    mv = mv[os.write(stdin_fd, mv):]
+                failed_frames = 0
+            except BrokenPipeError:
+                log("[CAM] ffmpeg pipe closed - stopping recording")
+                break
+            except Exception as e:
+                # Transient per-frame error - typically capture_array
+                # racing a still capture's mode switch that camera_busy
+                # didn't catch in time. Skip the frame; give up only if
+                # nothing gets through for a few seconds.
+                failed_frames += 1
+                if failed_frames == 1:
+                    log(f"[CAM] Recording frame skipped: {e}")
+                if failed_frames >= RECORD_FPS * 5:
+                    log("[CAM] Recording aborted - frame errors persisted")
+                    break
+    except Exception as e:
+        log(f"[CAM] Recording loop error: {e}")
+    finally:
+        try:
+            proc.stdin.close()
+            proc.wait(timeout=10)
+        except Exception as e:
+            log(f"[CAM] ffmpeg did not exit cleanly: {e}")
+        # If the loop died on its own (pipe closed, persistent errors)
+        # rather than via stop_recording, clear the recording state so
+        # status doesn't report a dead recording forever and new
+        # recordings can start
+        if recording:
+            with camera_lock:
+                if recording:
+                    recording = False
+                    recording_start_time = None
+                    current_recording_file = None
+                    log("[CAM] Recording state cleared after loop exit")
+
+
 def start_recording():
     """
     Start recording video.
     Returns the filename being recorded to.
     """
-    global recording, recording_start_time, current_recording_file, encoder, output, picam2
+    global recording, recording_start_time, current_recording_file, encoder, output, picam2, _record_thread
 
     if not FFMPEG_AVAILABLE:
         log("[CAM] Cannot record - ffmpeg not installed")
         return None
 
+    # Initialize BEFORE taking camera_lock: init_camera acquires the same
+    # non-reentrant lock when the camera isn't up yet, so calling it from
+    # inside the with-block would deadlock on a fresh server. Its lock-free
+    # fast path makes the pre-call cheap once initialized.
+    try:
+        cam = init_camera()
+    except Exception as e:
+        log(f"[CAM] Failed to start recording: {e}")
+        return None
+
     with camera_lock:
         if recording:
             return current_recording_file  # Already recording
 
         try:
-            cam = init_camera()
-
             timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
             filename = f"ROV_{timestamp}.mp4"
             filepath = os.path.join(RECORDINGS_DIR, filename)
 
-            # Create H264 encoder and output
-            encoder = H264Encoder(bitrate=VIDEO_BITRATE)
-            output = FfmpegOutput(filepath)
-
-            # Start recording
-            cam.start_encoder(encoder, output)
-
-            recording = True
-            recording_start_time = time.time()
+            if RECORD_MODE == 'overlay':
+                # HUD burn-in path: a worker thread captures frames, draws
+                # the overlay and pipes raw video into ffmpeg
+                recording = True
+                _record_thread = threading.Thread(
+                    target=_recording_loop, args=(filepath,), daemon=True)
+                _record_thread.start()
+                log(f"[CAM] Recording started: {filename} "
+                    f"({RECORD_SIZE[0]}x{RECORD_SIZE[1]} @ {RECORD_FPS}fps, {H264_ENCODER}, HUD overlay)")
+            else:
+                # Plain hardware encode, no overlay
+                encoder = H264Encoder(bitrate=VIDEO_BITRATE)
+                output = BufferedFfmpegOutput(filepath)
+                cam.start_encoder(encoder, output)
+                recording = True
+                log(f"[CAM] Recording started: {filename} ({VIDEO_SIZE[0]}x{VIDEO_SIZE[1]} @ {VIDEO_BITRATE//1000000}Mbps)")
+
+            recording_start_time = time.monotonic()
             current_recording_file = filename
-
-            log(f"[CAM] Recording started: {filename} ({VIDEO_SIZE[0]}x{VIDEO_SIZE[1]} @ {VIDEO_BITRATE//1000000}Mbps)")
             return filename
 
         except Exception as e:
@@ -330,73 +690,93 @@ def stop_recording():
     Stop the current recording.
     Returns the filename of the completed recording.
     """
-    global recording, recording_start_time, current_recording_file, encoder, output, picam2
+    global recording, recording_start_time, current_recording_file, encoder, output, picam2, _record_thread
 
     with camera_lock:
         if not recording:
             return None
 
+        # Clear the flag first so the overlay worker's loop exits; it is
+        # joined outside camera_lock so a slow last frame can't deadlock us
+        recording = False
+        thread = _record_thread
+        _record_thread = None
+
         try:
             if picam2 is not None and encoder is not None:
-                picam2.stop_encoder()
+                # Stop only the recording encoder - the MJPEG stream keeps running
+                picam2.stop_encoder(encoder)
+        except Exception as e:
+            log(f"[CAM] Failed to stop recording encoder: {e}")
 
-            filename = current_recording_file
-            filepath = os.path.join(RECORDINGS_DIR, filename) if filename else None
-            duration = time.time() - recording_start_time if recording_start_time else 0
+        filename = current_recording_file
+        filepath = os.path.join(RECORDINGS_DIR, filename) if filename else None
+        duration = time.monotonic() - recording_start_time if recording_start_time else 0
 
-            recording = False
-            recording_start_time = None
-            current_recording_file = None
-            encoder = None
-            output = None
+        recording_start_time = None
+        current_recording_file = None
+        encoder = None
+        output = None
 
-            # Verify file was saved
-            if filepath and os.path.exists(filepath):
-                file_size = os.path.getsize(filepath)
-                log(f"[CAM] Recording stopped: {filename} ({duration:.1f}s, {file_size/1024/1024:.1f}MB)")
-            else:
-                log(f"[CAM] WARNING: Recording file not found after stop: {filename}")
+    # Let the overlay worker flush its last frame and close ffmpeg
+    if thread is not None:
+        thread.join(timeout=15)
 
-            return filename
+    # Verify file was saved
+    if filepath and os.path.exists(filepath):
+        file_size = os.path.getsize(filepath)
+        log(f"[CAM] Recording stopped: {filename} ({duration:.1f}s, {file_size/1024/1024:.1f}MB)")
+    else:
+        log(f"[CAM] WARNING: Recording file not found after stop: {filename}")
 
-        except Exception as e:
-            log(f"[CAM] Failed to stop recording: {e}")
-            recording = False
-            return None
+    return filename
 
 def get_recording_status():
-    """Return current recording status."""
+    """Return current recording status.
+
+    Lock-free: snapshot the scalars first so a concurrent stop can't
+    tear the reads, then build the dict from the locals.
+    """
+    rec = recording
+    start = recording_start_time
+    fname = current_recording_file
+
     elapsed = 0
-    if recording and recording_start_time:
-        elapsed = time.time() - recording_start_time
+    if rec and start:
+        elapsed = time.monotonic() - start
 
     return {
-        "recording": recording,
-        "filename": current_recording_file,
+        "recording": rec,
+        "filename": fname,
         "elapsed_seconds": round(elapsed, 1),
         "ffmpeg_available": FFMPEG_AVAILABLE,
         "camera_busy": camera_busy
     }
 
 def list_recordings():
-    """List all recorded video files with sizes."""
+    """List all recorded video files with sizes, newest first."""
     try:
-        files = []
-        for f in os.listdir(RECORDINGS_DIR):
-            if f.endswith('.mp4'):
-                filepath = os.path.join(RECORDINGS_DIR, f)
-                size_mb = os.path.getsize(filepath) / 1024 / 1024
-                files.append({"name": f, "size_mb": round(size_mb, 1)})
-        return sorted(files, key=lambda x: x['name'], reverse=True)
+        entries = []
+        with os.scandir(RECORDINGS_DIR) as it:
+            for e in it:
+                if e.name.endswith('.mp4') and e.is_file():
+                    st = e.stat()
+                    entries.append((st.st_mtime, e.name, st.st_size))
+        entries.sort(reverse=True)
+        return [{"name": name, "size_mb": round(size / 1048576, 1)}
+                for _, name, size in entries]
     except OSError as e:
         log(f"[CAM] Failed to list recordings: {e}")
         return []
 
 def list_images():
-    """List all captured image files."""
+    """List all captured image files, newest first."""
     try:
-        files = os.listdir(IMAGES_DIR)
-        return sorted([f for f in files if f.endswith('.jpg')], reverse=True)
+        with os.scandir(IMAGES_DIR) as it:
+            entries = [(e.stat().st_mtime, e.name)
+                       for e in it if e.name.endswith('.jpg') and e.is_file()]
+        entries.sort(reverse=True)
+        return [name for _, name in entries]
     except OSError as e:
         log(f"[CAM] Failed to list images: {e}")
         return []
@@ -118,11 +118,8 @@ sensor_data = {
 # GPIO setup (run at import)
 GPIO.setwarnings(False)
 GPIO.setmode(GPIO.BCM)
-GPIO.setup(led_pin, GPIO.OUT)
-GPIO.output(led_pin, GPIO.LOW)
+GPIO.setup(led_pin, GPIO.OUT, initial=GPIO.LOW)
 # Leak sensor - input with pull-up (active LOW when wet)
 GPIO.setup(leak_pin, GPIO.IN, pull_up_down=GPIO.PUD_UP)
-# Setup only real motor pins
-for p in horizontal_pins + descend_pins + ascend_pins:
-    GPIO.setup(p, GPIO.OUT)
-    GPIO.output(p, GPIO.LOW)
+# Setup only real motor pins - one batched call, driven low from the start
+GPIO.setup(horizontal_pins + descend_pins + ascend_pins, GPIO.OUT, initial=GPIO.LOW)
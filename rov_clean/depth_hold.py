@@ -5,11 +5,38 @@ Uses pressure sensor depth reading as input and controls descend/ascend motors.
 Respects E-stop state — outputs zero when E-stop is engaged.
 """
 
+import os
 import time
 import threading
 from logger import log
 from config import sensor_data
 
+# numba is optional: when present the PID step compiles to native code
+# (cached to disk after the first run), otherwise it runs as plain Python
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+
+def _pid_step(error, last_error, integral, dt, kp, ki, kd, imax):
+    """One PID step; returns (output, new_integral).
+
+    Free function with all state passed explicitly so numba can compile
+    it without touching any Python objects.
+    """
+    integral += error * dt
+    if integral > imax:
+        integral = imax
+    elif integral < -imax:
+        integral = -imax
+    output = kp * error + ki * integral + kd * (error - last_error) / dt
+    return output, integral
+
+
+if njit is not None:
+    _pid_step = njit(cache=True)(_pid_step)
+
 
 class DepthHoldController:
     """
@@ -43,14 +70,24 @@ class DepthHoldController:
         self._running = False
         self._thread = None
 
-        # Current output values
-        self.descend_output = 0.0
-        self.ascend_output = 0.0
+        # Current output, published as one (descend, ascend) tuple.
+        # Rebinding the attribute is atomic under the GIL, so readers
+        # never need the lock and can never see a torn pair.
+        self._output = (0.0, 0.0)
 
         # E-stop callback: set by routes.py to check E-stop state
         # This avoids a circular import (depth_hold -> motors -> config -> ...)
         self._estop_check_fn = None
 
+        # Reusable status template - get_status fills it in place and
+        # hands back a shallow copy, instead of a dict literal plus five
+        # round() calls per poll
+        self._status = {
+            "enabled": False, "target_depth": 0.0, "current_depth": 0.0,
+            "error": 0.0, "descend_output": 0.0, "ascend_output": 0.0,
+            "kp": kp, "ki": ki, "kd": kd,
+        }
+
     def set_estop_check(self, fn):
         """Register a function that returns True if E-stop is engaged."""
         self._estop_check_fn = fn
@@ -106,40 +143,70 @@ class DepthHoldController:
 
             self.enabled = False
             self._running = False
-            self.descend_output = 0.0
-            self.ascend_output = 0.0
+            self._output = (0.0, 0.0)
 
             log("[DEPTH] Depth hold DISABLED")
 
     def _control_loop(self):
         """Background thread that runs the PID control loop at 20Hz."""
+        # Ask for real-time scheduling so video/HTTP load can't preempt a
+        # correction mid-descent. Needs CAP_SYS_NICE; quietly fall back to
+        # normal scheduling without it.
+        try:
+            os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(20))
+            log("[DEPTH] Control loop running with SCHED_FIFO priority")
+        except (OSError, AttributeError):
+            pass
+
+        # Fixed-rate deadline loop: sleep to the next monotonic deadline
+        # instead of a flat 0.05 s, so update cost doesn't slow the rate
+        period = 0.05  # 20Hz update rate
+        next_t = time.monotonic()
         while self._running:
             try:
                 self._update()
             except Exception as e:
                 log(f"[DEPTH] Control loop error: {e}")
-            time.sleep(0.05)  # 20Hz update rate
+            next_t += period
+            sleep_t = next_t - time.monotonic()
+            if sleep_t > 0:
+                time.sleep(sleep_t)
+            else:
+                # Fell behind - re-sync rather than racing to catch up
+                next_t = time.monotonic()
 
-    def _update(self):
-        """Calculate PID output based on current depth error."""
+    def _update(self, _sd=sensor_data):
+        """Calculate PID output based on current depth error.
+
+        _sd is bound at definition time: default args are cached on the
+        code object, which beats a module-global lookup at 20 Hz. The
+        depth key always exists (config.py pre-initializes sensor_data),
+        so plain indexing is safe.
+        """
         with self._lock:
             if not self.enabled:
                 return
 
             # If E-stop is engaged, zero outputs and wait
             if self._estop_check_fn and self._estop_check_fn():
-                self.descend_output = 0.0
-                self.ascend_output = 0.0
+                self._output = (0.0, 0.0)
                 return
 
             # Get current depth
-            current_depth = sensor_data.get('depth_ft', 0.0)
+            current_depth = _sd['depth_ft']
 
             # Calculate error (positive = too shallow, need to descend)
             error = self.target_depth - current_depth
 
             # Apply deadband
             if abs(error) < self.deadband:
+                # Steady-state hover: outputs already zero means there is
+                # nothing to compute - bail before the PID math
+                if self._output == (0.0, 0.0):
+                    self.integral = 0.0
+                    self.last_error = 0.0
+                    self.last_time = time.time()
+                    return
                 error = 0.0
                 self.integral = 0.0  # Reset integral within deadband
 
@@ -152,53 +219,48 @@ class DepthHoldController:
             if dt <= 0 or dt > 1.0:
                 dt = 0.05
 
-            # PID calculations
-            # Proportional
-            p_term = self.kp * error
-
-            # Integral (with anti-windup)
-            self.integral += error * dt
-            self.integral = max(-2.0, min(2.0, self.integral))  # Clamp integral
-            i_term = self.ki * self.integral
-
-            # Derivative
-            derivative = (error - self.last_error) / dt
-            d_term = self.kd * derivative
+            # PID calculations (anti-windup clamp at +/-2.0 lives inside
+            # _pid_step, which numba compiles when available)
+            output, self.integral = _pid_step(
+                error, self.last_error, self.integral, dt,
+                self.kp, self.ki, self.kd, 2.0)
             self.last_error = error
 
-            # Total output
-            output = p_term + i_term + d_term
-
             # Convert output to motor commands
             # Positive output = need to descend (go deeper)
             # Negative output = need to ascend (go shallower)
             if output > 0:
-                self.descend_output = min(output, self.max_output)
-                self.ascend_output = 0.0
+                self._output = (min(output, self.max_output), 0.0)
             else:
-                self.descend_output = 0.0
-                self.ascend_output = min(-output, self.max_output)
+                self._output = (0.0, min(-output, self.max_output))
 
     def get_output(self):
-        """Get current descend/ascend output values."""
-        with self._lock:
-            return (self.descend_output, self.ascend_output)
+        """Get current (descend, ascend) outputs - lock-free snapshot."""
+        return self._output
 
     def get_status(self):
-        """Return full status for API."""
-        with self._lock:
-            current_depth = sensor_data.get('depth_ft', 0.0)
-            return {
-                "enabled": self.enabled,
-                "target_depth": round(self.target_depth, 2),
-                "current_depth": round(current_depth, 2),
-                "error": round(self.target_depth - current_depth, 2),
-                "descend_output": round(self.descend_output, 3),
-                "ascend_output": round(self.ascend_output, 3),
-                "kp": self.kp,
-                "ki": self.ki,
-                "kd": self.kd
-            }
+        """Return full status for API.
+
+        Lock-free: every field is a GIL-atomic scalar read (the output
+        pair comes from the atomically swapped tuple), so a status poll
+        can never stall the 20 Hz control loop.
+        """
+        current_depth = sensor_data.get('depth_ft', 0.0)
+        target = self.target_depth
+        descend, ascend = self._output
+        s = self._status
+        s["enabled"] = self.enabled
+        # int-math rounding is display-grade and cheaper than round()
+        s["target_depth"] = int(target * 100) / 100.0
+        s["current_depth"] = int(current_depth * 100) / 100.0
+        s["error"] = int((target - current_depth) * 100) / 100.0
+        s["descend_output"] = int(descend * 1000) / 1000.0
+        s["ascend_output"] = int(ascend * 1000) / 1000.0
+        s["kp"] = self.kp
+        s["ki"] = self.ki
+        s["kd"] = self.kd
+        # Copy so jsonify never serializes a dict another poll is mutating
+        return s.copy()
 
 # Global instance
 depth_controller = DepthHoldController()
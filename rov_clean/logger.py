@@ -1,12 +1,47 @@
 # logger.py
-import time, sys
+import os, queue, threading, time, sys
+from collections import deque
+
+# Ring buffer for the /logs page - deque drops the oldest entry in O(1)
+log_buffer = deque(maxlen=300)
+
+_stdout_fd = sys.__stdout__.fileno()
+
+# Producers only enqueue; one daemon thread owns the stdout fd so a slow
+# consumer (journald, an SSH pipe) can never block the control loops
+_log_q = queue.SimpleQueue()
+
+
+def _drain():
+    while True:
+        batch = [_log_q.get()]
+        # Coalesce whatever else is already queued into one write
+        try:
+            while True:
+                batch.append(_log_q.get_nowait())
+        except queue.Empty:
+            pass
+        try:
+            os.write(_stdout_fd, "".join(batch).encode())
+        except OSError:
+            pass
+
+
+threading.Thread(target=_drain, daemon=True).start()
+
+
+# strftime re-parses the format and calls localtime each time; the
+# timestamp only changes once per second, so cache it on the whole second
+_last_sec = 0
+_last_ts = ""
 
-log_buffer = []
 
 def log(msg):
-    ts = time.strftime("%H:%M:%S")
-    entry = f"[{ts}] {msg}"
+    global _last_sec, _last_ts
+    s = int(time.time())
+    if s != _last_sec:
+        _last_ts = time.strftime("%H:%M:%S", time.localtime(s))
+        _last_sec = s
+    entry = f"[{_last_ts}] {msg}"
     log_buffer.append(entry)
-    if len(log_buffer) > 300:
-        log_buffer.pop(0)
-    sys.__stdout__.write(entry + "\n")
+    _log_q.put(entry + "\n")
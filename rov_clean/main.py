@@ -1,4 +1,5 @@
 # main.py
+import logging
 from flask import Flask
 import RPi.GPIO as GPIO
 from logger import log
@@ -6,6 +7,29 @@ import routes  # imports init_app (but camera is lazy)
 import telemetry_logger
 # camera_module is lazy-init, no side-effect required here
 
+# Quiet the werkzeug access log for high-frequency polling routes; each
+# UI client hits these several times a second and the lines drown out
+# everything useful. The filter inspects record.args so dropped records
+# never pay getMessage()'s %-formatting cost.
+QUIET_PATHS = ('/video_feed', '/status', '/status/stream',
+               '/motor/pwm_status', '/depth_hold/status')
+_QUIET_NEEDLES = tuple(f'GET {p} ' for p in QUIET_PATHS)
+
+
+class QuietRequestFilter(logging.Filter):
+    """Drop access-log records for the polling endpoints above."""
+
+    def filter(self, record):
+        for arg in record.args or ():
+            if isinstance(arg, str):
+                for needle in _QUIET_NEEDLES:
+                    if needle in arg:
+                        return False
+        return True
+
+
+logging.getLogger('werkzeug').addFilter(QuietRequestFilter())
+
 app = Flask(__name__, static_folder="web/static", template_folder="web/templates")
 routes.init_app(app)
 
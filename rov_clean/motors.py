@@ -1,6 +1,9 @@
 # motors.py
+import math
+import os
 import time
 import threading
+import numpy as np
 import RPi.GPIO as GPIO
 from gpiozero import PWMOutputDevice
 from logger import log
@@ -21,12 +24,18 @@ class MotorController:
         self.active = set()
         self.lock = threading.Lock()
         self.last_time = 0.0
+        # Real pins per group, resolved once instead of filtering against
+        # REAL_PINS on every button press (placeholder pins like 1, 2
+        # drop out here)
+        real = frozenset(self.REAL_PINS)
+        self._real_group = {name: tuple(p for p in pins if p in real)
+                            for name, pins in MOTOR_GROUPS.items()}
 
     def toggle(self, name):
-        now = time.time()
-        pins = MOTOR_GROUPS[name]
-        # Filter to only real pins (skip placeholder pins like 1, 2)
-        real_pins = [p for p in pins if p in self.REAL_PINS]
+        # Monotonic clock for the rate limit - NTP steps can't shrink or
+        # stretch the activation interval
+        now = time.monotonic()
+        real_pins = self._real_group[name]
         if not real_pins:
             log(f"[MOTOR] {name} has no real pins configured yet")
             return "denied"
@@ -38,18 +47,24 @@ class MotorController:
                     return "denied"
                 if now - self.last_time < MIN_ACTIVATE_INTERVAL_S:
                     return "wait"
-                for p in real_pins:
+                # Turn-on stays staggered on purpose - the delay spreads
+                # ESC inrush current, so no banked set here. Don't log or
+                # sleep more than the stagger itself requires, though.
+                last = len(real_pins) - 1
+                for i, p in enumerate(real_pins):
                     self.status[p] = 1
                     GPIO.output(p, GPIO.HIGH)
-                    log(f"[MOTOR] {name} ON motor {p}")
-                    time.sleep(GROUP_STAGGER_S)
+                    if i < last:
+                        time.sleep(GROUP_STAGGER_S)
+                log(f"[MOTOR] {name} ON {real_pins}")
                 self.active.add(name)
                 self.last_time = now
                 return "on"
             else:
+                # Whole group low in one call - no inrush concern on turn-off
+                GPIO.output(real_pins, GPIO.LOW)
                 for p in real_pins:
                     self.status[p] = 0
-                    GPIO.output(p, GPIO.LOW)
                 self.active.discard(name)
                 log(f"[MOTOR] {name} OFF")
                 return "off"
@@ -64,9 +79,71 @@ class PWMMotorController:
     def __init__(self):
         self.lock = threading.Lock()
         self.pwm_devices = {}
-        self.current_duties = {p: 0.0 for p in motor_pins}
-        self.target_duties = {p: 0.0 for p in motor_pins}
-        self.last_command_time = 0.0
+
+        # Duty-cycle state lives in flat float32 arrays ordered like
+        # motor_pins; pin_index maps a BCM pin to its array slot. Dict
+        # hashing and boxed-float math were measurable in the 50 Hz path.
+        self.pin_index = {p: i for i, p in enumerate(motor_pins)}
+        n = len(motor_pins)
+        self.current_duties = np.zeros(n, dtype=np.float32)
+        self.target_duties = np.zeros(n, dtype=np.float32)
+        self._real_idx = np.array([self.pin_index[p] for p in self.REAL_PINS],
+                                  dtype=np.int32)
+        # Last duty actually committed to each device, quantized to the
+        # hardware's 8-bit resolution - a write whose quantized value
+        # matches is invisible to the motor, so it is never re-sent
+        # (-1 forces the first write through)
+        self._written = np.full(n, -1, dtype=np.int16)
+
+        # Mixing matrices built once from the config dicts: rows follow
+        # motor_pins order, columns are [surge, sway, yaw]
+        self._h_mix = np.zeros((n, 3), dtype=np.float32)
+        for pin, mix in THRUST_MIX.items():
+            self._h_mix[self.pin_index[pin]] = mix
+        self._descend_mix = np.zeros(n, dtype=np.float32)
+        for pin, mix in DESCEND_MIX.items():
+            self._descend_mix[self.pin_index[pin]] = mix
+        self._ascend_mix = np.zeros(n, dtype=np.float32)
+        for pin, mix in ASCEND_MIX.items():
+            self._ascend_mix[self.pin_index[pin]] = mix
+
+        # Latest requested thrust vector plus a sequence counter. The
+        # request thread only stashes here; a 50 Hz worker applies the
+        # newest vector, so packet bursts coalesce into one hardware
+        # update per period and stagger sleeps never block Flask.
+        self._pending = None
+        self._pending_seq = 0
+        self._applied_seq = 0
+
+        # Double-buffered dicts for publishing pwm_state['duties']: write
+        # into the inactive one and swap the reference, so steady-state
+        # updates allocate nothing and readers always see a whole dict
+        self._duties_buf = ({p: 0.0 for p in motor_pins},
+                            {p: 0.0 for p in motor_pins})
+        self._duties_buf_idx = 0
+
+        # Immutable duty snapshot, rebound atomically on every publish so
+        # the watchdog and status polls read it without taking the lock
+        self._snapshot_tuple = (0.0,) * n
+
+        # Pins whose device write has failed - masked out of the write
+        # loop so one flaky device can't throw per pass
+        self._bad_pins = set()
+
+        # True while any published duty is above zero - computed once per
+        # publish so the watchdog and status paths read a plain bool
+        # instead of re-scanning the snapshot
+        self._any_active = False
+
+        # Bumped whenever published state changes; status routes compare
+        # it to decide whether a cached JSON body can be replayed
+        self.status_gen = 0
+
+        # Internal timestamps are integer monotonic nanoseconds: immune
+        # to NTP steps and compared with plain integer arithmetic in the
+        # watchdog loop. The epoch-seconds 'last_update' the API exposes
+        # lives in pwm_state.
+        self.last_command_ns = 0
         self.initialized = False
 
         # Track vertical thrust input values for UI display
@@ -78,7 +155,7 @@ class PWMMotorController:
         self.estop_locked = False
 
         # Heartbeat tracking: last time a heartbeat was received from controller
-        self.last_heartbeat_time = 0.0
+        self.last_heartbeat_ns = 0
 
         # Configuration
         self.frequency = PWM_CONFIG['frequency']
@@ -87,6 +164,8 @@ class PWMMotorController:
         self.stagger_delay = PWM_CONFIG['stagger_delay']
         self.watchdog_timeout = PWM_CONFIG['watchdog_timeout']
         self.heartbeat_timeout = PWM_CONFIG['heartbeat_timeout']
+        self.watchdog_timeout_ns = int(self.watchdog_timeout * 1e9)
+        self.heartbeat_timeout_ns = int(self.heartbeat_timeout * 1e9)
 
     def initialize(self):
         """Initialize PWM devices and start watchdog. Called lazily on first use."""
@@ -99,6 +178,19 @@ class PWMMotorController:
 
             log("[PWM] Initializing PWM motor controller...")
 
+            # Prefer the pigpio pin factory when the daemon is running:
+            # pigpiod times PWM edges with the DMA engine instead of
+            # RPi.GPIO's software loop, and each duty update becomes one
+            # socket write with no per-device threading. Falls back to
+            # the default factory when pigpio or the daemon is absent.
+            pin_factory = None
+            try:
+                from gpiozero.pins.pigpio import PiGPIOFactory
+                pin_factory = PiGPIOFactory()
+                log("[PWM] Using pigpio pin factory (DMA-timed PWM)")
+            except Exception:
+                log("[PWM] pigpiod unavailable - using default pin factory")
+
             # Clean up GPIO before initializing gpiozero PWM (only real pins)
             for p in self.REAL_PINS:
                 try:
@@ -113,7 +205,8 @@ class PWMMotorController:
                         pin,
                         active_high=True,
                         initial_value=0,
-                        frequency=self.frequency
+                        frequency=self.frequency,
+                        pin_factory=pin_factory
                     )
                     log(f"[PWM] Motor pin {pin} initialized")
                 except Exception as e:
@@ -127,6 +220,11 @@ class PWMMotorController:
             watchdog.start()
             log("[PWM] Watchdog thread started")
 
+            # Start the PWM update worker
+            worker = threading.Thread(target=self._pwm_worker_loop, daemon=True)
+            worker.start()
+            log("[PWM] Update worker thread started")
+
     def _watchdog_loop(self):
         """Background thread that checks for communication loss and heartbeat timeout."""
         while True:
@@ -135,53 +233,93 @@ class PWMMotorController:
                 self._check_heartbeat()
             except Exception as e:
                 log(f"[PWM] Watchdog error: {e}")
-            time.sleep(0.15)
+            # Adaptive interval: when motors are running, wake just in
+            # time for the nearest possible timeout; when everything is
+            # already stopped there is nothing urgent to catch
+            delay = 0.15
+            lc = self.last_command_ns
+            if lc > 0 and self._any_active:
+                remaining = (self.watchdog_timeout_ns
+                             - (time.monotonic_ns() - lc)) * 1e-9
+                if remaining > 0:
+                    delay = min(0.15, max(0.02, remaining))
+            time.sleep(delay)
 
     def _check_watchdog(self):
-        """Stop motors if no PWM command received within timeout."""
-        with self.lock:
-            if self.last_command_time > 0 and not self.estop_locked:
-                elapsed = time.time() - self.last_command_time
-                if elapsed > self.watchdog_timeout:
-                    if any(self.current_duties[p] > 0 for p in self.REAL_PINS):
-                        log(f"[PWM] Watchdog timeout ({elapsed:.2f}s) - stopping motors")
+        """Stop motors if no PWM command received within timeout.
+
+        The timeout test reads lock-free snapshots; the lock is only
+        taken on the rare stop path, where the condition is re-verified.
+        """
+        if self.last_command_ns > 0 and not self.estop_locked:
+            elapsed_ns = time.monotonic_ns() - self.last_command_ns
+            if elapsed_ns > self.watchdog_timeout_ns and self._any_active:
+                with self.lock:
+                    if time.monotonic_ns() - self.last_command_ns > self.watchdog_timeout_ns:
+                        log(f"[PWM] Watchdog timeout ({elapsed_ns * 1e-9:.2f}s) - stopping motors")
                         self._zero_all_motors()
 
     def _check_heartbeat(self):
-        """Stop motors if no heartbeat received within timeout."""
-        with self.lock:
-            if self.last_heartbeat_time > 0 and not self.estop_locked:
-                elapsed = time.time() - self.last_heartbeat_time
-                if elapsed > self.heartbeat_timeout:
-                    if any(self.current_duties[p] > 0 for p in self.REAL_PINS):
-                        log(f"[PWM] Heartbeat timeout ({elapsed:.2f}s) - stopping motors")
+        """Stop motors if no heartbeat received within timeout.
+
+        Same lock-free check / locked stop pattern as _check_watchdog.
+        """
+        if self.last_heartbeat_ns > 0 and not self.estop_locked:
+            elapsed_ns = time.monotonic_ns() - self.last_heartbeat_ns
+            if elapsed_ns > self.heartbeat_timeout_ns and self._any_active:
+                with self.lock:
+                    if time.monotonic_ns() - self.last_heartbeat_ns > self.heartbeat_timeout_ns:
+                        log(f"[PWM] Heartbeat timeout ({elapsed_ns * 1e-9:.2f}s) - stopping motors")
                         self._zero_all_motors()
 
+    def _publish_duties(self):
+        """Swap current duties into pwm_state['duties'] without allocating.
+
+        Must be called with self.lock held.
+        """
+        idx = self._duties_buf_idx ^ 1
+        buf = self._duties_buf[idx]
+        vals = self.current_duties.tolist()
+        for p, v in zip(motor_pins, vals):
+            buf[p] = v
+        self._duties_buf_idx = idx
+        pwm_state['duties'] = buf
+        self._snapshot_tuple = tuple(vals)
+        self._any_active = bool((self.current_duties > 0).any())
+        self.status_gen += 1
+
     def _zero_all_motors(self):
         """Zero all motor outputs. Must be called with self.lock held."""
-        for pin in motor_pins:
-            self.current_duties[pin] = 0.0
-            self.target_duties[pin] = 0.0
-            if pin in self.pwm_devices:
-                self.pwm_devices[pin].value = 0.0
+        self.current_duties[:] = 0.0
+        self.target_duties[:] = 0.0
+        # Only touch devices that aren't already at zero per the write
+        # cache - a watchdog/E-stop trip with motors idle costs nothing
+        for pin, device in self.pwm_devices.items():
+            if self._written[self.pin_index[pin]] != 0:
+                device.value = 0.0
+        self._written[:] = 0
         self.descend_value = 0.0
         self.ascend_value = 0.0
-        pwm_state['duties'] = {p: 0.0 for p in motor_pins}
+        self._publish_duties()
         pwm_state['active'] = False
         pwm_state['last_update'] = time.time()
 
     def record_heartbeat(self):
-        """Record that a heartbeat was received from the controller."""
-        with self.lock:
-            self.last_heartbeat_time = time.time()
+        """Record that a heartbeat was received from the controller.
+
+        A single integer store is GIL-atomic, so no lock is needed.
+        """
+        self.last_heartbeat_ns = time.monotonic_ns()
 
     def apply_deadband(self, value):
-        """Apply deadband to input value."""
-        if abs(value) < self.deadband:
-            return 0.0
-        # Rescale so deadband edge maps to 0
-        sign = 1.0 if value > 0 else -1.0
-        return sign * (abs(value) - self.deadband) / (1.0 - self.deadband)
+        """Apply deadband to input value, rescaled so the deadband edge maps to 0.
+
+        Branchless: max() folds the inside-deadband case to 0.0 and
+        copysign restores the input sign, so the 5-per-tick calls never
+        take a Python-level branch.
+        """
+        return math.copysign(
+            max(0.0, abs(value) - self.deadband) / (1.0 - self.deadband), value)
 
     def calculate_motor_duties(self, surge, sway, yaw, descend, ascend):
         """
@@ -195,47 +333,76 @@ class PWMMotorController:
             ascend:  0.0 to 1.0 (right trigger - ascend intensity)
 
         Returns:
-            dict of {pin: duty_cycle} where duty_cycle is 0.0-1.0
+            float32 array of duty cycles (0.0-1.0) ordered like motor_pins
+        """
+        # One matrix-vector product covers the horizontal thrusters
+        # (unidirectional, so negative contributions clip to zero) and the
+        # mix vectors scale the descend/ascend triggers
+        raw = (self._h_mix @ np.array([surge, sway, yaw], dtype=np.float32)
+               + self._descend_mix * descend
+               + self._ascend_mix * ascend)
+        np.clip(raw, 0.0, 1.0, out=raw)
+        return raw
+
+    def _pwm_worker_loop(self):
+        """Apply the most recent thrust vector at up to 50 Hz.
+
+        Only the newest pending vector is ever applied, so a burst of
+        joystick packets collapses into a single hardware update.
         """
-        duties = {}
+        # Real-time scheduling keeps duty updates steady under video and
+        # HTTP load; same best-effort pattern as the depth-hold loop
+        # (needs CAP_SYS_NICE, silently degrades without it)
+        try:
+            os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(20))
+            log("[PWM] Update worker running with SCHED_FIFO priority")
+        except (OSError, AttributeError):
+            pass
 
-        # Horizontal thrusters (unidirectional - only positive duty cycle)
-        for pin, (s_mix, w_mix, y_mix) in THRUST_MIX.items():
-            raw = surge * s_mix + sway * w_mix + yaw * y_mix
-            duties[pin] = max(0.0, min(1.0, raw))
+        while True:
+            try:
+                seq = self._pending_seq
+                if seq != self._applied_seq:
+                    pending = self._pending
+                    self._applied_seq = seq
+                    if pending is not None:
+                        self._apply_thrust_vector(*pending)
+            except Exception as e:
+                log(f"[PWM] Worker error: {e}")
+            time.sleep(0.02)
 
-        # Descend motors (left trigger) - pins 6, 20
-        for pin, mix in DESCEND_MIX.items():
-            duties[pin] = max(0.0, min(1.0, descend * mix))
+    def set_thrust_vector(self, surge, sway, yaw, descend, ascend):
+        """
+        Set the thrust vector for the ROV.
 
-        # Ascend motors (right trigger) - pins 15, 18
-        for pin, mix in ASCEND_MIX.items():
-            duties[pin] = max(0.0, min(1.0, ascend * mix))
+        Stashes the command for the PWM worker thread and returns the
+        published duty snapshot - a tuple ordered like motor_pins, no
+        per-call dict build. The snapshot is all zeros while E-stop is
+        engaged (the latch zeroed the motors when it fired).
+        """
+        self.initialize()
 
-        return duties
+        with self.lock:
+            if self.estop_locked:
+                return self._snapshot_tuple
+            # Stamp receipt here so the watchdog window starts when the
+            # command arrives, not when the worker gets around to it
+            self.last_command_ns = time.monotonic_ns()
 
-    def smooth_duty(self, pin, target):
-        """Apply rate limiting for smooth transitions."""
-        current = self.current_duties[pin]
-        delta = target - current
+        self._pending = (surge, sway, yaw, descend, ascend)
+        self._pending_seq += 1
 
-        # Apply rate limiting
-        if abs(delta) > self.ramp_rate:
-            delta = self.ramp_rate if delta > 0 else -self.ramp_rate
+        return self._snapshot_tuple
 
-        return current + delta
+    def _apply_thrust_vector(self, surge, sway, yaw, descend, ascend):
+        """Worker-side body: deadband, mix, ramp and write the hardware.
 
-    def set_thrust_vector(self, surge, sway, yaw, descend, ascend):
+        Bails out immediately if E-stop is engaged.
         """
-        Set the thrust vector for the ROV.
-        Returns zeros immediately if E-stop is engaged.
-        """
-        self.initialize()
-
         # Check E-stop FIRST — refuse all commands while locked
         with self.lock:
             if self.estop_locked:
-                return {p: 0.0 for p in motor_pins}
+                return
 
         # Apply deadband to inputs
         surge = self.apply_deadband(surge)
@@ -247,49 +414,66 @@ class PWMMotorController:
         # Calculate target duty cycles OUTSIDE the lock
         target_duties = self.calculate_motor_duties(surge, sway, yaw, descend, ascend)
 
-        # Calculate smoothed values OUTSIDE the lock
-        smoothed_duties = {}
-        for pin in self.REAL_PINS:
-            target = target_duties.get(pin, 0.0)
-            smoothed_duties[pin] = self.smooth_duty(pin, target)
+        # Calculate smoothed values OUTSIDE the lock: one clipped delta
+        # over the whole array rate-limits every pin at once, and the
+        # fancy-indexed add leaves placeholder pins untouched
+        smoothed = self.current_duties.copy()
+        delta = target_duties - smoothed
+        np.clip(delta, -self.ramp_rate, self.ramp_rate, out=delta)
+        ri = self._real_idx
+        smoothed[ri] += delta[ri]
 
         # Update state and identify changed pins INSIDE the lock (no sleeps)
         with self.lock:
             # Re-check E-stop in case it was engaged between the two lock acquisitions
             if self.estop_locked:
-                return {p: 0.0 for p in motor_pins}
+                return
 
-            self.last_command_time = time.time()
+            self.last_command_ns = time.monotonic_ns()
 
             # Store vertical thrust values for UI display
             self.descend_value = descend
             self.ascend_value = ascend
 
-            pins_to_update = {}
-            for pin in self.REAL_PINS:
-                new_duty = smoothed_duties[pin]
-                if abs(new_duty - self.current_duties[pin]) > 0.01:
-                    self.current_duties[pin] = new_duty
-                    pins_to_update[pin] = new_duty
+            # One vectorized compare instead of a Python branch per pin
+            changed = np.abs(smoothed - self.current_duties) > 0.01
+            self.current_duties[changed] = smoothed[changed]
+            pins_to_update = {motor_pins[i]: float(smoothed[i])
+                              for i in np.flatnonzero(changed)}
 
             # Update shared state
-            pwm_state['duties'] = self.current_duties.copy()
-            pwm_state['active'] = any(d > 0 for d in self.current_duties.values())
-            pwm_state['last_update'] = self.last_command_time
+            self._publish_duties()
+            pwm_state['active'] = self._any_active
+            pwm_state['last_update'] = time.time()
             pwm_state['control_mode'] = 'pwm'
 
-        # Apply hardware writes OUTSIDE the lock with stagger delay between pins.
-        # Stagger spreads inrush current across time so paired motor boards
-        # don't spike simultaneously. Check estop_locked each iteration so an
-        # emergency stop issued during the stagger window is not overwritten.
-        for pin, duty in pins_to_update.items():
-            if self.estop_locked:
-                break
-            if pin in self.pwm_devices:
-                self.pwm_devices[pin].value = duty
-            time.sleep(self.stagger_delay)
-
-        return self.current_duties.copy()
+        # Apply hardware writes OUTSIDE the lock, checking estop_locked
+        # each iteration so an emergency stop is never overwritten.
+        # No stagger between duty updates: ramp_rate already caps each
+        # tick's change at 5% duty, so there is no full-swing step for a
+        # stagger to spread - it only added up to (n-1)*stagger_delay of
+        # latency per worker pass. MotorController.toggle keeps its
+        # stagger, where motors really do switch hard on.
+        # One exception handler around the whole batch keeps the success
+        # path free of per-iteration setup; a pin that throws is masked
+        # via _bad_pins and the rest of the batch lands next pass.
+        pin = None
+        try:
+            for pin, duty in pins_to_update.items():
+                if self.estop_locked:
+                    break
+                if pin in self._bad_pins:
+                    continue
+                idx = self.pin_index[pin]
+                q = int(duty * 255)
+                if self._written[idx] == q:
+                    continue
+                if pin in self.pwm_devices:
+                    self.pwm_devices[pin].value = duty
+                    self._written[idx] = q
+        except Exception as e:
+            self._bad_pins.add(pin)
+            log(f"[PWM] Write to pin {pin} failed - masking it: {e}")
 
     def emergency_stop(self):
         """Immediately stop all motors and LATCH the E-stop.
@@ -307,9 +491,11 @@ class PWMMotorController:
             if not self.estop_locked:
                 return False
             self.estop_locked = False
+            self.status_gen += 1
             # Reset command time so watchdog doesn't immediately fire
-            self.last_command_time = time.time()
-            self.last_heartbeat_time = time.time()
+            now_ns = time.monotonic_ns()
+            self.last_command_ns = now_ns
+            self.last_heartbeat_ns = now_ns
             log("[PWM] E-STOP RELEASED - motors unlocked")
             return True
 
@@ -323,17 +509,22 @@ class PWMMotorController:
         pass
 
     def get_status(self):
-        """Get current PWM status."""
-        with self.lock:
-            return {
-                'duties': self.current_duties.copy(),
-                'descend': self.descend_value,
-                'ascend': self.ascend_value,
-                'active': any(d > 0 for d in self.current_duties.values()),
-                'last_update': self.last_command_time,
-                'control_mode': pwm_state['control_mode'],
-                'estop_locked': self.estop_locked
-            }
+        """Get current PWM status.
+
+        Lock-free: builds the response from the atomically published
+        snapshot tuple and GIL-atomic scalars, so HTTP polls never
+        contend with the PWM worker.
+        """
+        snap = self._snapshot_tuple
+        return {
+            'duties': dict(zip(motor_pins, snap)),
+            'descend': self.descend_value,
+            'ascend': self.ascend_value,
+            'active': self._any_active,
+            'last_update': pwm_state['last_update'],
+            'control_mode': pwm_state['control_mode'],
+            'estop_locked': self.estop_locked
+        }
 
     def cleanup(self):
         """Clean up PWM devices."""
@@ -345,6 +536,7 @@ class PWMMotorController:
                 except Exception:
                     pass
             self.pwm_devices.clear()
+            self._bad_pins.clear()
             self.initialized = False
             log("[PWM] Cleanup complete")
 
@@ -1,10 +1,65 @@
 # routes.py
 from flask import render_template, jsonify, Response, request, send_from_directory
-import io, time, os
+import io, json, time, os
 import RPi.GPIO as GPIO
 
+# orjson is optional: it decodes the tiny controller payloads several
+# times faster than stdlib json, which matters on the 50 Hz /motor/pwm
+# path; everything still works on stdlib json without it
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# With orjson present, route every jsonify through it as well - the UI
+# polls several JSON endpoints continuously and stdlib serialization is
+# the biggest single cost on them. Needs Flask's provider API (>= 2.2).
+_OrjsonProvider = None
+if orjson is not None:
+    try:
+        from flask.json.provider import DefaultJSONProvider
+
+        class _OrjsonProvider(DefaultJSONProvider):
+            """JSON provider that serializes with orjson (numpy-aware)."""
+
+            def dumps(self, obj, **kwargs):
+                return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+
+            def loads(self, s, **kwargs):
+                return orjson.loads(s)
+    except ImportError:
+        pass
+
+
+def _fast_json(req):
+    """Parse a request body with orjson when present; stdlib fallback.
+
+    Returns None for an empty or malformed body so handlers keep their
+    existing "No JSON data received" 400 path.
+    """
+    if orjson is not None:
+        try:
+            return orjson.loads(req.get_data(cache=False))
+        except orjson.JSONDecodeError:
+            return None
+    return req.get_json(silent=True)
+
+
+def _get_axes(data):
+    """Extract and clamp the five thrust axes from a parsed /motor/pwm body.
+
+    Sticks are clamped to [-1, 1], triggers to [0, 1].
+    """
+    get = data.get
+    return (max(-1.0, min(1.0, float(get('surge', 0.0)))),
+            max(-1.0, min(1.0, float(get('sway', 0.0)))),
+            max(-1.0, min(1.0, float(get('yaw', 0.0)))),
+            max(0.0, min(1.0, float(get('descend', 0.0)))),
+            max(0.0, min(1.0, float(get('ascend', 0.0)))))
+
 from logger import log, log_buffer
-from config import sensor_data, led_pin, motor_states, MOTOR_GROUPS, led_state, pwm_state
+from config import (sensor_data, led_pin, motor_states, MOTOR_GROUPS, led_state,
+                    pwm_state, motor_pins)
 from calibration import calib, cal_lock, save_calib
 from motors import motor, pwm_motor
 import sensors   # ensures sensor loop is running
@@ -28,6 +83,27 @@ servo.init()
 # This function will be called by main.py to attach routes to the Flask app.
 def init_app(app):
 
+    if _OrjsonProvider is not None:
+        app.json = _OrjsonProvider(app)
+
+    # No key sorting or pretty whitespace on responses - clients parse
+    # the JSON, they never diff it, and /status pays this per poll
+    try:
+        app.json.sort_keys = False
+        app.json.compact = True
+    except AttributeError:
+        # Flask < 2.2 uses config flags instead of the provider
+        app.config['JSON_SORT_KEYS'] = False
+        app.config['JSONIFY_PRETTYPRINT_REGULAR'] = False
+
+    # Generation-keyed response caches for the polled status endpoints:
+    # the JSON body is rebuilt only when the backing state has actually
+    # changed, and the generation doubles as an ETag so an unchanged poll
+    # can come back 304 with no body at all
+    _motor_gen = [0]
+    _motor_status_cache = {'gen': -1, 'body': ''}
+    _pwm_status_cache = {'gen': -1, 'body': ''}
+
     @app.route("/")
     def index():
         # serve the index.html from templates (static assets from web/static)
@@ -37,6 +113,21 @@ def init_app(app):
     def status():
         return jsonify({'sensor': sensor_data})
 
+    @app.route("/status/stream")
+    def status_stream():
+        """Server-Sent Events telemetry stream.
+
+        Pushes one event per sensor_loop update, so the UI gets fresh data
+        without paying HTTP headers and dispatch for every poll. /status is
+        kept for compatibility.
+        """
+        def event_stream():
+            while True:
+                with sensors.telemetry_cond:
+                    sensors.telemetry_cond.wait(timeout=1.0)
+                yield f"data: {json.dumps({'sensor': sensor_data})}\n\n"
+        return Response(event_stream(), mimetype='text/event-stream')
+
 
 
     @app.route("/heartbeat")
@@ -81,6 +172,7 @@ def init_app(app):
                     result = motor.toggle(name)
                     if result == "off":
                         motor_states[name] = "off"
+                        _motor_gen[0] += 1
                         stopped.append(name)
                 except Exception as e:
                     log(f"[MOTOR] failed stopping {name}: {e}")
@@ -125,24 +217,19 @@ def init_app(app):
         import sensors as s
         with cal_lock:
             if not s.imu_offsets_enabled:
-                expected = {'x': 0.0, 'y': 0.0, 'z': 1.0}
-                ax = sensor_data['accel_x']
-                ay = sensor_data['accel_y']
-                az = sensor_data['accel_z']
-
-                s.accel_offsets['x'] = ax - expected['x']
-                s.accel_offsets['y'] = ay - expected['y']
-                s.accel_offsets['z'] = az - expected['z']
-
-                s.gyro_offsets['x'] = sensor_data['gyro_x']
-                s.gyro_offsets['y'] = sensor_data['gyro_y']
-                s.gyro_offsets['z'] = sensor_data['gyro_z']
+                # Gravity should read (0, 0, 1) g when level
+                s.accel_offsets[:] = (sensor_data['accel_x'],
+                                      sensor_data['accel_y'],
+                                      sensor_data['accel_z'] - 1.0)
+                s.gyro_offsets[:] = (sensor_data['gyro_x'],
+                                     sensor_data['gyro_y'],
+                                     sensor_data['gyro_z'])
 
                 s.imu_offsets_enabled = True
                 msg = "IMU calibration offsets applied (gravity aligned to Z)"
             else:
-                s.accel_offsets = {'x': 0.0, 'y': 0.0, 'z': 0.0}
-                s.gyro_offsets  = {'x': 0.0, 'y': 0.0, 'z': 0.0}
+                s.accel_offsets[:] = 0.0
+                s.gyro_offsets[:]  = 0.0
                 s.imu_offsets_enabled = False
                 msg = "IMU calibration offsets cleared"
 
@@ -158,11 +245,20 @@ def init_app(app):
         result = motor.toggle(name)
         if result in ("on", "off"):
             motor_states[name] = result
+            _motor_gen[0] += 1
         return jsonify({"group": name, "state": result})
 
     @app.route("/motor_status")
     def motor_status():
-        return jsonify(motor_states)
+        gen = _motor_gen[0]
+        etag = str(gen)
+        if request.if_none_match.contains(etag):
+            return Response(status=304, headers={'ETag': etag})
+        if gen != _motor_status_cache['gen']:
+            _motor_status_cache['body'] = json.dumps(motor_states)
+            _motor_status_cache['gen'] = gen
+        return Response(_motor_status_cache['body'],
+                        mimetype='application/json', headers={'ETag': etag})
 
     @app.route("/cal_depth")
     def cal_depth():
@@ -194,28 +290,18 @@ def init_app(app):
         Returns zeros immediately if E-stop is engaged.
         """
         try:
-            data = request.get_json()
+            data = _fast_json(request)
             if not data:
                 return jsonify({"error": "No JSON data received"}), 400
 
-            surge = float(data.get('surge', 0.0))
-            sway = float(data.get('sway', 0.0))
-            yaw = float(data.get('yaw', 0.0))
-            descend = float(data.get('descend', 0.0))
-            ascend = float(data.get('ascend', 0.0))
+            surge, sway, yaw, descend, ascend = _get_axes(data)
 
-            # Clamp values to valid range
-            surge = max(-1.0, min(1.0, surge))
-            sway = max(-1.0, min(1.0, sway))
-            yaw = max(-1.0, min(1.0, yaw))
-            descend = max(0.0, min(1.0, descend))  # 0-1 range for triggers
-            ascend = max(0.0, min(1.0, ascend))    # 0-1 range for triggers
-
-            # Depth hold: override vertical axes with PID output
+            # Depth hold: override vertical axes with PID output. _output
+            # is the atomically-swapped (descend, ascend) tuple the PID
+            # thread publishes - reading it directly skips a method call
+            # per controller packet
             if depth_controller.enabled:
-                pid_descend, pid_ascend = depth_controller.get_output()
-                descend = pid_descend
-                ascend = pid_ascend
+                descend, ascend = depth_controller._output
 
             # Heading hold: override yaw with PID output
             if heading_controller.enabled:
@@ -225,11 +311,13 @@ def init_app(app):
             if position_controller.enabled:
                 surge, sway = position_controller.get_output()
 
+            # Snapshot tuple ordered like motor_pins - only turned into a
+            # dict here, at serialization time
             duties = pwm_motor.set_thrust_vector(surge, sway, yaw, descend, ascend)
 
             return jsonify({
                 "success": True,
-                "duties": {str(k): round(v, 3) for k, v in duties.items()},
+                "duties": {str(p): d for p, d in zip(motor_pins, duties)},
                 "depth_hold_active": depth_controller.enabled,
                 "heading_hold_active": heading_controller.enabled,
                 "position_hold_active": position_controller.enabled,
@@ -242,18 +330,32 @@ def init_app(app):
 
     @app.route("/motor/pwm_status")
     def motor_pwm_status():
-        """Return current PWM duty cycles for all motors."""
+        """Return current PWM duty cycles for all motors.
+
+        status_gen only advances when the controller publishes new state,
+        so an idle ROV serves every poll from the cached body (or a 304).
+        While driving, the generation bumps each worker pass and the body
+        is rebuilt as before.
+        """
         try:
-            status = pwm_motor.get_status()
-            return jsonify({
-                "duties": {str(k): round(v, 3) for k, v in status['duties'].items()},
-                "descend": round(status['descend'], 3),
-                "ascend": round(status['ascend'], 3),
-                "active": status['active'],
-                "last_update": status['last_update'],
-                "control_mode": status['control_mode'],
-                "estop_locked": status['estop_locked']
-            })
+            gen = pwm_motor.status_gen
+            etag = str(gen)
+            if request.if_none_match.contains(etag):
+                return Response(status=304, headers={'ETag': etag})
+            if gen != _pwm_status_cache['gen']:
+                status = pwm_motor.get_status()
+                _pwm_status_cache['body'] = json.dumps({
+                    "duties": {str(k): v for k, v in status['duties'].items()},
+                    "descend": status['descend'],
+                    "ascend": status['ascend'],
+                    "active": status['active'],
+                    "last_update": status['last_update'],
+                    "control_mode": status['control_mode'],
+                    "estop_locked": status['estop_locked']
+                })
+                _pwm_status_cache['gen'] = gen
+            return Response(_pwm_status_cache['body'],
+                            mimetype='application/json', headers={'ETag': etag})
         except Exception as e:
             log(f"[PWM] Error getting PWM status: {e}")
             return jsonify({"error": str(e)}), 500
@@ -430,7 +532,7 @@ def init_app(app):
     def depth_hold_tune():
         """Adjust PID gains with bounds checking."""
         try:
-            data = request.get_json()
+            data = _fast_json(request)
             if not data:
                 return jsonify({"error": "No JSON data received"}), 400
 
@@ -9,6 +9,13 @@ from config import sensor_data, leak_pin
 from calibration import calib, cal_lock
 from dead_reckoning import dr_estimator
 
+# numba is optional (same pattern as depth_hold): the per-tick filter
+# arithmetic compiles to native code when present, plain Python otherwise
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
 try:
     from ahrs.filters import Madgwick as _MadgwickFilter
     _AHRS_OK = True
@@ -27,6 +34,9 @@ except ImportError:
 _last_leak_state = False
 _sensor_lock = threading.Lock()
 
+# Notified once per sensor_data publish - SSE clients in routes.py wait on this
+telemetry_cond = threading.Condition()
+
 # Shared orientation state (Euler angles, degrees) — read by routes.py
 roll_f = pitch_f = yaw_f = 0.0
 
@@ -43,9 +53,33 @@ if _AHRS_OK:
 # Pressure median filter
 pressure_buf = deque(maxlen=5)
 
-# IMU calibration offsets (applied before filter)
-accel_offsets = {'x': 0.0, 'y': 0.0, 'z': 0.0}
-gyro_offsets  = {'x': 0.0, 'y': 0.0, 'z': 0.0}
+
+def _median5(a, b, c, d, e):
+    """Median of five with a 6-compare min/max network, no sort or list.
+
+    Runs every sensor tick once the buffer is full; sorted() on a fresh
+    list copy was an allocation plus ~10 comparisons for the same answer.
+    """
+    if b < a:
+        a, b = b, a
+    if d < c:
+        c, d = d, c
+    if c < a:
+        a, c = c, a
+        b, d = d, b
+    # a is now the minimum of the first four, so the median of all five
+    # is the second-smallest of the remaining (b, c, d, e)
+    if e < b:
+        b, e = e, b
+    if b < c:
+        return c if c < e else e
+    return b if b < d else d
+
+# IMU calibration offsets (applied before filter) — [x, y, z] arrays,
+# indexed per tick instead of hashing string keys; zero_imu fills them
+# in place
+accel_offsets = np.zeros(3)
+gyro_offsets  = np.zeros(3)
 imu_offsets_enabled = False
 
 # Magnetometer calibration collection state
@@ -76,6 +110,15 @@ _MAG_BASELINE_ALPHA = 0.999  # ~50 s time-constant at 20 Hz
 _alpha_c = 0.98
 last_time = time.time()
 
+# Hot-loop constants, folded once at import instead of per 20 Hz tick
+_F_SCALE = 9.0 / 5.0
+_DEG2RAD = math.pi / 180.0
+_HPA_TO_INHG = 0.02953
+_HPA_TO_FT_WATER = 0.033488
+_ONE_MINUS_COMPASS = 1.0 - _COMPASS_ALPHA
+_ONE_MINUS_MAG_BASELINE = 1.0 - _MAG_BASELINE_ALPHA
+_ONE_MINUS_ALPHA_C = 1.0 - _alpha_c
+
 
 def reset_orientation():
     """Reset quaternion from current accel reading — no convergence drift after zero."""
@@ -181,6 +224,40 @@ def _apply_mag_remap(mx, my, mz):
             raw[idx[2]] * sign[2])
 
 
+def _tilt_step(roll_f, pitch_f, ax, ay, az, gx, gy, dt, alpha):
+    """One complementary-filter step for roll/pitch (degrees).
+
+    Free function with scalar args so numba can compile it; the ~10
+    float ops here run every tick of the fallback path.
+    """
+    ar = math.degrees(math.atan2(ay, az))
+    ap = math.degrees(math.atan2(-ax, math.sqrt(ay * ay + az * az)))
+    roll = alpha * (roll_f + gx * dt) + (1.0 - alpha) * ar
+    pitch = alpha * (pitch_f + gy * dt) + (1.0 - alpha) * ap
+    return roll, pitch
+
+
+def _mag_yaw_deg(rmx, rmy, rmz, roll_deg, pitch_deg):
+    """Tilt-compensated compass heading (degrees) from remapped mag axes.
+
+    Projects the field onto the horizontal plane (NED: x=fwd, y=right,
+    z=down). Shared by the Madgwick and complementary paths, which used
+    to carry two copies of this trigonometry.
+    """
+    roll_r = math.radians(roll_deg)
+    pitch_r = math.radians(pitch_deg)
+    cr, sr = math.cos(roll_r), math.sin(roll_r)
+    cp, sp = math.cos(pitch_r), math.sin(pitch_r)
+    mx = rmx * cp + rmz * sp
+    my = rmx * sr * sp + rmy * cr - rmz * sr * cp
+    return math.degrees(math.atan2(-my, mx))
+
+
+if njit is not None:
+    _tilt_step = njit(cache=True, fastmath=True)(_tilt_step)
+    _mag_yaw_deg = njit(cache=True, fastmath=True)(_mag_yaw_deg)
+
+
 def _quat_from_accel(ax, ay, az):
     """Compute a gravity-referenced quaternion (yaw=0) from an accelerometer reading."""
     norm = math.sqrt(ax**2 + ay**2 + az**2)
@@ -266,12 +343,16 @@ def sensor_loop():
             # ── Pressure / depth ────────────────────────────────────────────
             pressure_hpa = ps.pressure
             tc = ps.temperature
-            tf = tc * 9.0 / 5.0 + 32.0
+            tf = tc * _F_SCALE + 32.0
 
             pressure_buf.append(pressure_hpa)
-            med_hpa = sorted(pressure_buf)[len(pressure_buf) // 2]
+            if len(pressure_buf) == 5:
+                med_hpa = _median5(*pressure_buf)
+            else:
+                # Warm-up only: first four ticks after start
+                med_hpa = sorted(pressure_buf)[len(pressure_buf) // 2]
 
-            depth_ft_raw = max(0.0, (med_hpa - 1013.25) * 0.033488)
+            depth_ft_raw = max(0.0, (med_hpa - 1013.25) * _HPA_TO_FT_WATER)
             with cal_lock:
                 dz = calib['depth_zero_ft']
             depth_ft = max(0.0, depth_ft_raw - dz)
@@ -281,8 +362,8 @@ def sensor_loop():
             gx, gy, gz = imu.read_float_gyro_all()   # deg/s
 
             if imu_offsets_enabled:
-                ax -= accel_offsets['x']; ay -= accel_offsets['y']; az -= accel_offsets['z']
-                gx -= gyro_offsets['x'];  gy -= gyro_offsets['y'];  gz -= gyro_offsets['z']
+                ax -= accel_offsets[0]; ay -= accel_offsets[1]; az -= accel_offsets[2]
+                gx -= gyro_offsets[0];  gy -= gyro_offsets[1];  gz -= gyro_offsets[2]
 
             temp_raw = imu.read_temp_c()
             if temp_raw is None:
@@ -293,7 +374,7 @@ def sensor_loop():
                 temp_c = temp_raw + 25.0
             else:
                 temp_c = 0.0
-            itf = temp_c * 9.0 / 5.0 + 32.0
+            itf = temp_c * _F_SCALE + 32.0
 
             # ── Magnetometer ─────────────────────────────────────────────────
             mx_cal = my_cal = mz_cal = 0.0
@@ -310,7 +391,7 @@ def sensor_loop():
                     pass  # transient mag read error — skip this sample
 
             # ── Attitude fusion (Madgwick 9-DOF or complementary fallback) ──
-            gyro_rad = np.array([gx, gy, gz]) * (math.pi / 180.0)
+            gyro_rad = np.array([gx, gy, gz]) * _DEG2RAD
             accel_g  = np.array([ax, ay, az])
             mag_cal  = np.array([mx_cal, my_cal, mz_cal])
             mag_norm = np.linalg.norm(mag_cal)
@@ -322,7 +403,7 @@ def sensor_loop():
                     _mag_baseline = mag_norm
                 else:
                     _mag_baseline = (_MAG_BASELINE_ALPHA * _mag_baseline
-                                     + (1 - _MAG_BASELINE_ALPHA) * mag_norm)
+                                     + _ONE_MINUS_MAG_BASELINE * mag_norm)
                 mag_anomaly = abs(mag_norm - _mag_baseline)
 
             with _q_lock:
@@ -340,18 +421,11 @@ def sensor_loop():
                     # ── Tilt-compensated compass for yaw ─────────────────
                     if mag is not None and mag_norm > 1.0:
                         rmx, rmy, rmz = _apply_mag_remap(mx_cal, my_cal, mz_cal)
-                        roll_r  = math.radians(roll_f)
-                        pitch_r = math.radians(pitch_f)
-                        cr, sr  = math.cos(roll_r), math.sin(roll_r)
-                        cp, sp  = math.cos(pitch_r), math.sin(pitch_r)
-                        # Project onto horizontal plane (NED: x=fwd, y=right, z=down)
-                        Mx = rmx * cp + rmz * sp
-                        My = rmx * sr * sp + rmy * cr - rmz * sr * cp
-                        mag_yaw  = math.degrees(math.atan2(-My, Mx))
+                        mag_yaw = _mag_yaw_deg(rmx, rmy, rmz, roll_f, pitch_f)
                         # Complementary filter — wrap-safe blend of gyro+mag
                         gyro_yaw = yaw_f + math.degrees(gyro_rad[2]) * dt
                         diff = ((mag_yaw - gyro_yaw) + 180.0) % 360.0 - 180.0
-                        yaw_f = gyro_yaw + (1.0 - _COMPASS_ALPHA) * diff
+                        yaw_f = gyro_yaw + _ONE_MINUS_COMPASS * diff
                     else:
                         # No mag available — gyro integration only (slow drift)
                         yaw_f += math.degrees(gyro_rad[2]) * dt
@@ -361,22 +435,14 @@ def sensor_loop():
                     # Keep previous Euler values on error
             else:
                 # ── Complementary filter fallback (no ahrs library) ───────
-                ar = math.degrees(math.atan2(ay, az))
-                ap = math.degrees(math.atan2(-ax, math.sqrt(ay**2 + az**2)))
-                roll_f  = _alpha_c * (roll_f  + gx * dt) + (1 - _alpha_c) * ar
-                pitch_f = _alpha_c * (pitch_f + gy * dt) + (1 - _alpha_c) * ap
+                roll_f, pitch_f = _tilt_step(roll_f, pitch_f,
+                                             ax, ay, az, gx, gy, dt, _alpha_c)
                 if mag is not None and mag_norm > 1.0:
                     rmx, rmy, rmz = _apply_mag_remap(mx_cal, my_cal, mz_cal)
-                    roll_r  = math.radians(roll_f)
-                    pitch_r = math.radians(pitch_f)
-                    cr, sr  = math.cos(roll_r), math.sin(roll_r)
-                    cp, sp  = math.cos(pitch_r), math.sin(pitch_r)
-                    Mx = rmx * cp + rmz * sp
-                    My = rmx * sr * sp + rmy * cr - rmz * sr * cp
-                    mag_yaw  = math.degrees(math.atan2(-My, Mx))
+                    mag_yaw = _mag_yaw_deg(rmx, rmy, rmz, roll_f, pitch_f)
                     gyro_yaw = yaw_f + gz * dt
                     diff = ((mag_yaw - gyro_yaw) + 180.0) % 360.0 - 180.0
-                    yaw_f = gyro_yaw + (1.0 - _alpha_c) * diff
+                    yaw_f = gyro_yaw + _ONE_MINUS_ALPHA_C * diff
                 else:
                     yaw_f += gz * dt
 
@@ -406,29 +472,35 @@ def sensor_loop():
                 _last_leak_state = leak_detected
 
             # ── Publish to shared dict ───────────────────────────────────
+            # Raw floats - display formatting is the client's job, and
+            # the PID consumers are better off without quantized depth
             sensor_data.update({
-                'pressure_inhg': round(med_hpa * 0.02953, 2),
-                'temperature_f': round(tf, 1),
-                'depth_ft': round(depth_ft, 2),
-                'accel_x': round(ax, 3), 'accel_y': round(ay, 3), 'accel_z': round(az, 3),
-                'gyro_x': round(gx, 1),  'gyro_y': round(gy, 1),  'gyro_z': round(gz, 1),
-                'imu_temp_f': round(itf, 1),
-                'roll':  round(_disp_roll  - ro, 1),
-                'pitch': round(_disp_pitch - po, 1),
-                'yaw':   round((_disp_yaw  - yo) % 360.0, 1),
-                'mag_x': round(mx_cal, 2), 'mag_y': round(my_cal, 2), 'mag_z': round(mz_cal, 2),
+                'pressure_inhg': med_hpa * _HPA_TO_INHG,
+                'temperature_f': tf,
+                'depth_ft': depth_ft,
+                'accel_x': ax, 'accel_y': ay, 'accel_z': az,
+                'gyro_x': gx, 'gyro_y': gy, 'gyro_z': gz,
+                'imu_temp_f': itf,
+                'roll':  _disp_roll  - ro,
+                'pitch': _disp_pitch - po,
+                'yaw':   (_disp_yaw  - yo) % 360.0,
+                'mag_x': mx_cal, 'mag_y': my_cal, 'mag_z': mz_cal,
                 'mag_ok': mag is not None,
-                'mag_anomaly': round(mag_anomaly, 2),
-                'mag_baseline': round(_mag_baseline or 0.0, 1),
-                'quat_w': round(float(q_snap[0]), 4),
-                'quat_x': round(float(q_snap[1]), 4),
-                'quat_y': round(float(q_snap[2]), 4),
-                'quat_z': round(float(q_snap[3]), 4),
+                'mag_anomaly': mag_anomaly,
+                'mag_baseline': _mag_baseline or 0.0,
+                'quat_w': float(q_snap[0]),
+                'quat_x': float(q_snap[1]),
+                'quat_y': float(q_snap[2]),
+                'quat_z': float(q_snap[3]),
                 **dr_state,
                 'leak_detected': leak_detected,
                 'sensor_ok': True,
             })
 
+            # Wake any SSE telemetry clients
+            with telemetry_cond:
+                telemetry_cond.notify_all()
+
             _consecutive_errors = 0
 
         except Exception as e:
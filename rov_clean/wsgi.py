@@ -0,0 +1,17 @@
+# wsgi.py
+"""Gunicorn entry point for the ROV control server.
+
+The Werkzeug dev server in main.py serializes long-lived responses
+(/video_feed, /status/stream) against motor and telemetry requests.
+For deployment run with threaded workers instead:
+
+    gunicorn -k gthread --threads 8 -w 1 -b 0.0.0.0:5000 --keep-alive 65 wsgi:app
+
+One worker process only - the camera and GPIO are single-owner hardware.
+"""
+from main import app
+from logger import log
+import telemetry_logger
+
+telemetry_logger.start()
+log("[START] ROV Control server running under gunicorn @ :5000")